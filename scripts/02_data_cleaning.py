@@ -1,96 +1,106 @@
 import pandas as pd
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
+from table_io import excel_engine, processed_data_path, table_ext, save_table
 
 # Set up paths
 raw_data_path = '../data/raw/'
-processed_data_path = '../data/processed/'
 
 # Create processed directory if it doesn't exist
 os.makedirs(processed_data_path, exist_ok=True)
 
-def clean_unemployment_data():
+def clean_unemployment_data(log=print):
     """
     Clean the unemployment and income data
     Skip header rows, standardize FIPS codes, reshape data
+    Progress lines go to log (print by default)
     """
-    print("Cleaning unemployment data...")
+    log("Cleaning unemployment data...")
+    
+    # Only parse the columns we actually use (the sheet has 100+ columns)
+    county_cols = ['FIPS_Code', 'State', 'Area_Name', 'Rural_Urban_Continuum_Code_2023', 
+                   'Urban_Influence_Code_2013', 'Metro_2023']
+    needed_cols = (county_cols + ['Median_Household_Income_2022'] +
+                   [f'Unemployment_rate_{year}' for year in range(2000, 2024)])
     
     # Read the unemployment file, skipping the header rows
-    df = pd.read_excel(f'{raw_data_path}Unemployment2023.xlsx', 
-                       sheet_name='Unemployment Med HH Income',
-                       skiprows=4)  # Skip the caption rows
+    with pd.ExcelFile(f'{raw_data_path}Unemployment2023.xlsx', engine=excel_engine) as xl:
+        df = xl.parse('Unemployment Med HH Income',
+                      skiprows=4,  # Skip the caption rows
+                      usecols=needed_cols)
     
     # Display basic info
-    print(f"Original shape: {df.shape}")
-    print(f"Columns: {list(df.columns)[:10]}...")  # Show first 10 columns
+    log(f"Original shape: {df.shape}")
+    log(f"Columns: {list(df.columns)[:10]}...")  # Show first 10 columns
     
     # Clean up - remove any completely empty rows
     df = df.dropna(subset=['FIPS_Code'])
     
-    # Convert FIPS to string and pad with zeros (some may be missing leading zeros)
-    df['FIPS_Code'] = df['FIPS_Code'].astype(str).str.zfill(5)
+    # FIPS codes are numeric in the workbook - keep them as integers for filtering
+    df['FIPS_Code'] = df['FIPS_Code'].astype('int32')
     
     # Keep only county-level data (exclude state and national totals)
-    # County FIPS codes are 5 digits, state codes end in 000
-    df = df[~df['FIPS_Code'].str.endswith('000')]
+    # State and national FIPS codes are multiples of 1000 (e.g. 01000, 00000)
+    df = df[df['FIPS_Code'] % 1000 != 0]
     
-    print(f"After filtering to counties only: {df.shape}")
+    # Format the remaining FIPS codes as 5-digit strings with leading zeros
+    df = df.assign(FIPS_Code=df['FIPS_Code'].map('{:05d}'.format))
     
-    # Extract key columns for our base tables
-    county_cols = ['FIPS_Code', 'State', 'Area_Name', 'Rural_Urban_Continuum_Code_2023', 
-                   'Urban_Influence_Code_2013', 'Metro_2023']
+    log(f"After filtering to counties only: {df.shape}")
     
     # Create counties table
-    counties_df = df[county_cols].copy()
+    counties_df = df[county_cols]
     counties_df.columns = ['fips_code', 'state', 'county_name', 'rural_urban_code', 
                           'urban_influence_code', 'metro_status']
     
     # Save counties table
-    counties_df.to_csv(f'{processed_data_path}counties.csv', index=False)
-    print(f"Counties table saved: {counties_df.shape}")
+    save_table(counties_df, 'counties')
+    log(f"Counties table saved: {counties_df.shape}")
     
     # Create economic data table (reshape unemployment and income data)
-    economic_data = []
-    
-    # Extract unemployment data for each year (2000-2023)
-    for year in range(2000, 2024):
-        year_data = df[['FIPS_Code', f'Unemployment_rate_{year}']].copy()
-        year_data['year'] = year
-        year_data.columns = ['fips_code', 'unemployment_rate', 'year']
-        year_data = year_data.dropna(subset=['unemployment_rate'])
-        economic_data.append(year_data)
-    
-    # Combine all years
-    economic_df = pd.concat(economic_data, ignore_index=True)
+    # Melt all the yearly unemployment columns (2000-2023) in one pass
+    unemp_cols = [col for col in df.columns if col.startswith('Unemployment_rate_')]
+    economic_df = df.melt(id_vars=['FIPS_Code'], value_vars=unemp_cols,
+                          var_name='year', value_name='unemployment_rate')
+    economic_df.columns = ['fips_code', 'year', 'unemployment_rate']
+
+    # Year comes from the column name suffix, e.g. Unemployment_rate_2022
+    economic_df['year'] = economic_df['year'].str[-4:].astype('int16')
+    economic_df = economic_df[['fips_code', 'unemployment_rate', 'year']]
+    economic_df = economic_df.dropna(subset=['unemployment_rate']).reset_index(drop=True)
     
     # Add median household income (2022 data available)
-    income_data = df[['FIPS_Code', 'Median_Household_Income_2022']].copy()
-    income_data.columns = ['fips_code', 'median_household_income_2022']
-    income_data = income_data.dropna(subset=['median_household_income_2022'])
+    income_map = df.set_index('FIPS_Code')['Median_Household_Income_2022']
     
-    # Merge income data with 2022 economic data
-    economic_df = economic_df.merge(income_data, on='fips_code', how='left')
+    # Fill income on the 2022 rows only instead of repeating it for every year
+    economic_df['median_household_income_2022'] = np.where(
+        economic_df['year'].to_numpy() == 2022,
+        economic_df['fips_code'].map(income_map),
+        np.nan
+    )
     
     # Save economic data
-    economic_df.to_csv(f'{processed_data_path}economic_annual.csv', index=False)
-    print(f"Economic annual table saved: {economic_df.shape}")
+    save_table(economic_df, 'economic_annual')
+    log(f"Economic annual table saved: {economic_df.shape}")
     
     return counties_df, economic_df
 
-def clean_population_data():
+def clean_population_data(log=print):
     """
     Clean the population data
+    Progress lines go to log (print by default)
     """
-    print("\nCleaning population data...")
+    log("\nCleaning population data...")
     
-    # Read population file
-    df = pd.read_excel(f'{raw_data_path}2024_pop_county.xlsx', 
-                       sheet_name='CO-EST2024-POP',
-                       skiprows=3)  # Skip header rows
+    # Read population file (column A is the area name, C:G are 2020-2024)
+    with pd.ExcelFile(f'{raw_data_path}2024_pop_county.xlsx', engine=excel_engine) as xl:
+        df = xl.parse('CO-EST2024-POP',
+                      skiprows=3,  # Skip header rows
+                      usecols='A,C:G')
     
-    print(f"Population data shape: {df.shape}")
-    print(f"Columns: {list(df.columns)}")
+    log(f"Population data shape: {df.shape}")
+    log(f"Columns: {list(df.columns)}")
     
     # This will need adjustment based on actual structure
     # We'll examine the data first and then clean
@@ -116,19 +126,27 @@ def preview_housing_data():
 if __name__ == "__main__":
     print("=== STARTING DATA CLEANING ===\n")
     
-    # Clean unemployment data first
-    counties_df, economic_df = clean_unemployment_data()
+    # Clean unemployment data and preview population data - the two workbooks
+    # are independent, so read them in parallel
+    unemployment_report, population_report = [], []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        unemployment_future = executor.submit(clean_unemployment_data, unemployment_report.append)
+        population_future = executor.submit(clean_population_data, population_report.append)
+        counties_df, economic_df = unemployment_future.result()
+        pop_df = population_future.result()
     
-    # Preview population data
-    pop_df = clean_population_data()
+    # Print each step's progress once both are done, in order (printing from
+    # the threads would interleave their lines)
+    for line in unemployment_report + population_report:
+        print(line)
     
     # Preview housing data
     bottom_sample, top_sample = preview_housing_data()
     
     print("\n=== CLEANING COMPLETE ===")
     print("Files created:")
-    print("- counties.csv")
-    print("- economic_annual.csv")
+    print(f"- counties{table_ext}")
+    print(f"- economic_annual{table_ext}")
     print("\nNext steps:")
     print("- Clean population data") 
     print("- Reshape housing price data")
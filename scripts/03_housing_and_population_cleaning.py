@@ -1,11 +1,10 @@
 import pandas as pd
 import numpy as np
-import os
 from datetime import datetime
+from table_io import excel_engine, table_ext, save_table, load_table
 
 # Set up paths
 raw_data_path = '../data/raw/'
-processed_data_path = '../data/processed/'
 
 def clean_population_data():
     """
@@ -14,9 +13,11 @@ def clean_population_data():
     print("Cleaning population data...")
     
     # Read population file, skipping the header rows we saw earlier
-    df = pd.read_excel(f'{raw_data_path}2024_pop_county.xlsx', 
-                       sheet_name='CO-EST2024-POP',
-                       skiprows=3)
+    # Only column A (area name) and C:G (2020-2024 estimates) are needed
+    with pd.ExcelFile(f'{raw_data_path}2024_pop_county.xlsx', engine=excel_engine) as xl:
+        df = xl.parse('CO-EST2024-POP',
+                      skiprows=3,
+                      usecols='A,C:G')
     
     print(f"Original population data shape: {df.shape}")
     print(f"Columns: {list(df.columns)}")
@@ -24,7 +25,7 @@ def clean_population_data():
     # The first column should be geographic area, let's examine the structure
     # From our earlier analysis, it looks like:
     # - Column 0: Geographic Area (county names)
-    # - Columns 2-6: Population estimates for 2020-2024
+    # - Columns 1-5: Population estimates for 2020-2024
     
     # Clean up column names
     df.columns = [str(col).strip() for col in df.columns]
@@ -32,7 +33,7 @@ def clean_population_data():
     # Filter to county-level data only (exclude state/national totals)
     # County rows typically contain "County" in the name
     county_mask = df.iloc[:, 0].astype(str).str.contains('County', na=False)
-    county_df = df[county_mask].copy()
+    county_df = df[county_mask]
     
     print(f"Counties identified: {len(county_df)}")
     
@@ -40,28 +41,25 @@ def clean_population_data():
     # We'll need to match these to our existing counties table
     county_df['clean_county_name'] = county_df.iloc[:, 0].astype(str)
     
-    # Reshape population data from wide to long
-    population_data = []
-    
     # Get the year columns (should be 2020, 2021, 2022, 2023, 2024)
     year_columns = [col for col in county_df.columns if str(col).isdigit()]
     print(f"Year columns found: {year_columns}")
-    
-    for _, row in county_df.iterrows():
-        county_name = row['clean_county_name']
-        
-        for year_col in year_columns:
-            if pd.notna(row[year_col]) and str(year_col).isdigit():
-                population_data.append({
-                    'county_name': county_name,
-                    'year': int(year_col),
-                    'population': row[year_col]
-                })
-    
-    population_df = pd.DataFrame(population_data)
+
+    # Reshape population data from wide to long
+    # The data is a rectangular counties x years block, so build the long
+    # columns straight from NumPy: ravel() walks it county by county, and
+    # the names/years are repeated/tiled to line up with it
+    n_counties = len(county_df)
+    n_years = len(year_columns)
+    population_df = pd.DataFrame({
+        'county_name': np.repeat(county_df['clean_county_name'].to_numpy(), n_years),
+        'year': np.tile(np.array([int(year) for year in year_columns], dtype='int16'), n_counties),
+        'population': county_df[year_columns].to_numpy().ravel()
+    })
+    population_df = population_df.dropna(subset=['population']).reset_index(drop=True)
     
     # Save population data (we'll merge with FIPS codes later)
-    population_df.to_csv(f'{processed_data_path}population_annual.csv', index=False)
+    save_table(population_df, 'population_annual')
     print(f"Population annual table saved: {population_df.shape}")
     
     return population_df
@@ -86,31 +84,40 @@ def reshape_housing_data():
     print(f"Date columns found: {len(bottom_date_cols)} bottom, {len(top_date_cols)} top")
     print(f"Date range: {bottom_date_cols[0]} to {bottom_date_cols[-1]}")
     
-    # Reshape bottom tier prices
+    # Reshape both tiers to long format, tagged by tier
     bottom_melted = bottom_df.melt(
-        id_vars=['RegionID', 'RegionName', 'StateName', 'State'],
+        id_vars=['RegionID'],
         value_vars=bottom_date_cols,
         var_name='date',
-        value_name='bottom_tier_price'
+        value_name='price'
     )
+    bottom_melted['tier'] = 'bottom_tier_price'
     
-    # Reshape top tier prices
     top_melted = top_df.melt(
-        id_vars=['RegionID', 'RegionName', 'StateName', 'State'],
+        id_vars=['RegionID'],
         value_vars=top_date_cols,
         var_name='date',
-        value_name='top_tier_price'
-    )
-    
-    # Merge bottom and top tier data
-    housing_prices = bottom_melted.merge(
-        top_melted[['RegionID', 'date', 'top_tier_price']], 
-        on=['RegionID', 'date'], 
-        how='outer'
+        value_name='price'
     )
-    
-    # Convert date column to datetime
-    housing_prices['date'] = pd.to_datetime(housing_prices['date'])
+    top_melted['tier'] = 'top_tier_price'
+    
+    # Stack the tiers and pivot them side by side (avoids an outer merge of
+    # the two long frames)
+    housing_prices = (pd.concat([bottom_melted, top_melted], ignore_index=True)
+                      .pivot(index=['RegionID', 'date'], columns='tier', values='price')
+                      .reset_index())
+    housing_prices.columns.name = None
+    
+    # Attach region details from the bottom tier file (one row per region)
+    region_info = bottom_df[['RegionID', 'RegionName', 'StateName', 'State']]
+    housing_prices = housing_prices.merge(region_info, on='RegionID', how='left',
+                                          validate='many_to_one')
+    housing_prices = housing_prices[['RegionID', 'RegionName', 'StateName', 'State', 'date',
+                                     'bottom_tier_price', 'top_tier_price']]
+    
+    # Convert date column to datetime (explicit format skips per-row inference,
+    # and cache=True parses each of the ~300 unique date labels only once)
+    housing_prices['date'] = pd.to_datetime(housing_prices['date'], format='%Y-%m-%d', cache=True)
     housing_prices['year'] = housing_prices['date'].dt.year
     housing_prices['month'] = housing_prices['date'].dt.month
     
@@ -118,31 +125,48 @@ def reshape_housing_data():
     # RegionName should be county names that match our counties table
     housing_prices['county_name'] = housing_prices['RegionName']
     
-    # Remove rows with no price data
-    housing_prices = housing_prices.dropna(subset=['bottom_tier_price', 'top_tier_price'], how='all')
+    # Remove rows with no price data (one NumPy mask, no copy when nothing is missing)
+    has_price = (housing_prices['bottom_tier_price'].notna().to_numpy() |
+                 housing_prices['top_tier_price'].notna().to_numpy())
+    if not has_price.all():
+        housing_prices = housing_prices.loc[has_price]
     
     print(f"Housing prices reshaped: {housing_prices.shape}")
     
     # Save monthly housing prices
-    housing_prices.to_csv(f'{processed_data_path}housing_prices_monthly.csv', index=False)
+    save_table(housing_prices, 'housing_prices_monthly')
     print("Housing prices monthly table saved")
     
     return housing_prices
 
-def calculate_affordability_metrics(housing_df):
+def calculate_annual_prices(housing_df):
+    """
+    Average the monthly housing prices per region and year
+    Shared by the affordability metrics and the price trends
+    """
+    print("\nCalculating annual average prices...")
+    
+    # sort=False skips re-sorting the groups (housing_df is already ordered by
+    # region and date), observed=True avoids empty category combinations
+    annual_prices = housing_df.groupby(['RegionID', 'county_name', 'year'],
+                                       sort=False, observed=True).agg(
+        bottom_tier_price=('bottom_tier_price', 'mean'),
+        top_tier_price=('top_tier_price', 'mean')
+    ).reset_index()
+    
+    return annual_prices
+
+def calculate_affordability_metrics(annual_prices):
     """
     Calculate minimum salary needed and affordability metrics
     """
     print("\nCalculating affordability metrics...")
     
     # Load our economic data to get median incomes
-    economic_df = pd.read_csv(f'{processed_data_path}economic_annual.csv')
+    economic_df = load_table('economic_annual')
     
-    # Create annual averages for housing prices
-    annual_housing = housing_df.groupby(['RegionID', 'county_name', 'year']).agg({
-        'bottom_tier_price': 'mean',
-        'top_tier_price': 'mean'
-    }).reset_index()
+    # Start from the annual averages for housing prices
+    annual_housing = annual_prices.copy(deep=False)
     
     # Calculate minimum salary needed (using 30% rule: housing shouldn't exceed 30% of income)
     # Assuming 5% annual housing cost (mortgage + taxes + insurance as % of home value)
@@ -153,36 +177,31 @@ def calculate_affordability_metrics(housing_df):
     annual_housing['top_tier_min_salary'] = annual_housing['top_tier_annual_cost'] / 0.30
     
     # Merge with actual median incomes (for 2022 where we have data)
-    income_2022 = economic_df[economic_df['year'] == 2022][['fips_code', 'median_household_income_2022']].copy()
+    income_2022 = economic_df[economic_df['year'] == 2022][['fips_code', 'median_household_income_2022']]
     
     # We'll need to create a mapping between county names and FIPS codes
-    counties_df = pd.read_csv(f'{processed_data_path}counties.csv')
+    counties_df = load_table('counties')
     
     # For now, save the affordability data and we'll join later
-    annual_housing.to_csv(f'{processed_data_path}housing_affordability.csv', index=False)
+    save_table(annual_housing, 'housing_affordability')
     print(f"Housing affordability table saved: {annual_housing.shape}")
     
     return annual_housing
 
-def create_annual_price_trends(housing_df):
+def create_annual_price_trends(annual_prices):
     """
     Create annual price trends and growth rates
     """
     print("\nCreating price trends...")
     
-    # Calculate annual averages and year-over-year growth
-    annual_trends = housing_df.groupby(['RegionID', 'county_name', 'year']).agg({
-        'bottom_tier_price': 'mean',
-        'top_tier_price': 'mean'
-    }).reset_index()
-    
-    # Calculate year-over-year growth rates
-    annual_trends = annual_trends.sort_values(['RegionID', 'year'])
-    annual_trends['bottom_tier_growth'] = annual_trends.groupby('RegionID')['bottom_tier_price'].pct_change() * 100
-    annual_trends['top_tier_growth'] = annual_trends.groupby('RegionID')['top_tier_price'].pct_change() * 100
+    # Calculate year-over-year growth rates from the annual averages
+    annual_trends = annual_prices.sort_values(['RegionID', 'year'])
+    # Both tiers go through a single groupby pass
+    growth = annual_trends.groupby('RegionID', sort=False)[['bottom_tier_price', 'top_tier_price']].pct_change() * 100
+    annual_trends[['bottom_tier_growth', 'top_tier_growth']] = growth.to_numpy()
     
     # Save price trends
-    annual_trends.to_csv(f'{processed_data_path}price_trends_annual.csv', index=False)
+    save_table(annual_trends, 'price_trends_annual')
     print(f"Price trends table saved: {annual_trends.shape}")
     
     return annual_trends
@@ -196,18 +215,21 @@ if __name__ == "__main__":
     # Reshape housing price data
     housing_df = reshape_housing_data()
     
+    # Average prices per year once, then reuse for both tables
+    annual_prices = calculate_annual_prices(housing_df)
+    
     # Calculate affordability metrics
-    affordability_df = calculate_affordability_metrics(housing_df)
+    affordability_df = calculate_affordability_metrics(annual_prices)
     
     # Create price trends
-    trends_df = create_annual_price_trends(housing_df)
+    trends_df = create_annual_price_trends(annual_prices)
     
     print("\n=== CLEANING COMPLETE ===")
     print("Files created:")
-    print("- population_annual.csv")
-    print("- housing_prices_monthly.csv") 
-    print("- housing_affordability.csv")
-    print("- price_trends_annual.csv")
+    print(f"- population_annual{table_ext}")
+    print(f"- housing_prices_monthly{table_ext}") 
+    print(f"- housing_affordability{table_ext}")
+    print(f"- price_trends_annual{table_ext}")
     
     print(f"\nData summary:")
     print(f"- Population data: {len(population_df)} records")
@@ -1,53 +1,89 @@
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
+from table_io import processed_data_path, table_ext, save_table, load_table, table_path
 
-# Set up paths
-processed_data_path = '../data/processed/'
+def load_processed_tables():
+    """
+    Read each processed table once - all fixes below run on these in memory
+    """
+    print("Loading processed tables...")
+    
+    # Declare the key column types for the CSV fallback so the parser skips
+    # type inference on them. FIPS codes are read as strings so leading zeros
+    # survive. (Every column is kept - the tables are written back in full.)
+    key_dtypes = {'fips_code': 'string[pyarrow]', 'county_name': 'string[pyarrow]'}
+    tables = {
+        'counties': load_table('counties', dtype={**key_dtypes, 'state': 'category'}),
+        'economic_annual': load_table('economic_annual', dtype={'fips_code': 'string[pyarrow]',
+                                                                'year': 'int16'}),
+        'population_annual': load_table('population_annual', dtype={**key_dtypes, 'year': 'int16'}),
+        'housing_affordability': load_table('housing_affordability', dtype=key_dtypes),
+        'price_trends_annual': load_table('price_trends_annual', dtype=key_dtypes)
+    }
+    print(f"Loaded {len(tables)} tables\n")
+    
+    return tables
+
+def save_processed_tables(tables):
+    """
+    Write every updated table back once, after all fixes are applied
+    """
+    for name, df in tables.items():
+        save_table(df, name)
 
-def check_and_fix_fips_codes():
+def check_and_fix_fips_codes(counties_df, economic_df, population_df):
     """
-    Check all our cleaned files for FIPS code formatting issues
+    Check all our cleaned tables for FIPS code formatting issues
     Ensure all FIPS codes are 5-digit strings with leading zeros
     """
     print("=== CHECKING AND FIXING FIPS CODES ===\n")
     
-    # 1. Check counties.csv
-    print("1. Checking counties.csv...")
-    counties_df = pd.read_csv(f'{processed_data_path}counties.csv')
+    # 1. Check counties table
+    print(f"1. Checking counties{table_ext}...")
     print(f"Current FIPS codes sample: {counties_df['fips_code'].head().tolist()}")
     print(f"FIPS code data type: {counties_df['fips_code'].dtype}")
     
-    # Fix FIPS codes - convert to string and pad with zeros
-    counties_df['fips_code'] = counties_df['fips_code'].astype(str).str.zfill(5)
+    # Fix FIPS codes - read as strings above, so only pad with zeros
+    counties_df['fips_code'] = counties_df['fips_code'].str.zfill(5)
     print(f"Fixed FIPS codes sample: {counties_df['fips_code'].head().tolist()}")
-    
-    # Save fixed version
-    counties_df.to_csv(f'{processed_data_path}counties.csv', index=False)
     print("✅ Counties FIPS codes fixed\n")
     
-    # 2. Check economic_annual.csv
-    print("2. Checking economic_annual.csv...")
-    economic_df = pd.read_csv(f'{processed_data_path}economic_annual.csv')
+    # 2. Check economic_annual table
+    print(f"2. Checking economic_annual{table_ext}...")
     print(f"Current FIPS codes sample: {economic_df['fips_code'].head().tolist()}")
     
     # Fix FIPS codes
-    economic_df['fips_code'] = economic_df['fips_code'].astype(str).str.zfill(5)
+    economic_df['fips_code'] = economic_df['fips_code'].str.zfill(5)
     print(f"Fixed FIPS codes sample: {economic_df['fips_code'].head().tolist()}")
     
-    # Save fixed version
-    economic_df.to_csv(f'{processed_data_path}economic_annual.csv', index=False)
+    # Put every FIPS column on one shared categorical dtype, so joins on
+    # fips_code compare integer codes instead of hashing strings
+    fips_codes = pd.Index(counties_df['fips_code'].unique()).union(economic_df['fips_code'].unique())
+    fips_dtype = pd.CategoricalDtype(fips_codes)
+    counties_df['fips_code'] = counties_df['fips_code'].astype(fips_dtype)
+    economic_df['fips_code'] = economic_df['fips_code'].astype(fips_dtype)
     print("✅ Economic FIPS codes fixed\n")
     
     # 3. Check housing data - these use RegionID but we need FIPS mapping
     print("3. Checking housing data structure...")
-    housing_monthly = pd.read_csv(f'{processed_data_path}housing_prices_monthly.csv', nrows=1000)  # Sample for speed
-    print(f"Housing data columns: {housing_monthly.columns.tolist()}")
-    print(f"Sample county names: {housing_monthly['county_name'].head().tolist()}")
+    housing_path = table_path('housing_prices_monthly')
+    if housing_path.endswith('.parquet'):
+        # Column names come from the Parquet footer alone, and only a few
+        # county names are decoded for the sample
+        housing_columns = pq.read_schema(housing_path).names
+        first_batch = next(pq.ParquetFile(housing_path).iter_batches(batch_size=5, columns=['county_name']))
+        sample_names = first_batch.column('county_name').to_pylist()
+    else:
+        # Header only for the column names, then a handful of rows
+        housing_columns = pd.read_csv(housing_path, nrows=0).columns.tolist()
+        sample_names = pd.read_csv(housing_path, nrows=5, usecols=['county_name'])['county_name'].tolist()
+    print(f"Housing data columns: {housing_columns}")
+    print(f"Sample county names: {sample_names}")
     print("Housing data uses RegionID and county names - we'll need to map to FIPS\n")
     
     # 4. Check population data - uses county names
     print("4. Checking population data...")
-    population_df = pd.read_csv(f'{processed_data_path}population_annual.csv')
     print(f"Sample county names: {population_df['county_name'].head().tolist()}")
     print("Population data uses county names - we'll need to map to FIPS\n")
     
@@ -60,102 +96,126 @@ def create_county_name_to_fips_mapping(counties_df):
     """
     print("5. Creating county name to FIPS mapping...")
     
-    # Clean county names for better matching
-    counties_df['clean_county_name'] = counties_df['county_name'].str.lower().str.strip()
-    
-    # Create mapping dictionary
-    fips_mapping = dict(zip(counties_df['clean_county_name'], counties_df['fips_code']))
+    # Create mapping as a Series indexed by the cleaned county name, so
+    # lookups go through pandas index alignment instead of a Python dict.
+    # Names are cleaned as Arrow-backed strings so the str methods run as
+    # pyarrow compute kernels rather than per-object Python calls
+    county_names = counties_df['county_name'].astype('string[pyarrow]')
+    fips_mapping = pd.Series(counties_df['fips_code'].to_numpy(),
+                             index=county_names.str.lower().str.strip().to_numpy(),
+                             dtype=counties_df['fips_code'].dtype)
     
     print(f"Created mapping for {len(fips_mapping)} counties")
     print("Sample mappings:")
-    for i, (name, fips) in enumerate(list(fips_mapping.items())[:5]):
+    for name, fips in fips_mapping.head().items():
         print(f"  {name} → {fips}")
     
     # Save mapping as reference file
-    mapping_df = counties_df[['fips_code', 'county_name', 'state']].copy()
+    mapping_df = counties_df[['fips_code', 'county_name', 'state']]
     mapping_df.to_csv(f'{processed_data_path}county_fips_mapping.csv', index=False)
     print("✅ County-FIPS mapping saved\n")
     
     return fips_mapping
 
-def add_fips_to_housing_data(fips_mapping):
+def map_fips_codes(df, fips_mapping):
+    """
+    Add a fips_code column to df by looking up clean_county_name in fips_mapping
+    """
+    # As a categorical, each distinct county name is looked up only once and
+    # the FIPS codes are gathered back onto the rows by category code
+    names = df['clean_county_name'].astype('category')
+    df['fips_code'] = names.map(fips_mapping).astype(fips_mapping.dtype)
+    return df
+
+def add_fips_to_housing_data(affordability_df, trends_df, fips_mapping):
     """
     Add FIPS codes to housing data using county name matching
     """
     print("6. Adding FIPS codes to housing data...")
     
-    # Load housing affordability data
-    affordability_df = pd.read_csv(f'{processed_data_path}housing_affordability.csv')
-    
-    # Clean county names for matching
+    # Clean county names for matching (as Arrow strings, see above)
+    affordability_df['county_name'] = affordability_df['county_name'].astype('string[pyarrow]')
     affordability_df['clean_county_name'] = affordability_df['county_name'].str.lower().str.strip()
     
     # Map FIPS codes
-    affordability_df['fips_code'] = affordability_df['clean_county_name'].map(fips_mapping)
+    affordability_df = map_fips_codes(affordability_df, fips_mapping)
     
     # Check mapping success rate
     mapped_count = affordability_df['fips_code'].notna().sum()
     total_count = len(affordability_df)
     print(f"FIPS mapping success: {mapped_count}/{total_count} ({mapped_count/total_count*100:.1f}%)")
-    
-    # Save updated housing affordability data
-    affordability_df.drop('clean_county_name', axis=1).to_csv(f'{processed_data_path}housing_affordability.csv', index=False)
+    affordability_df = affordability_df.drop('clean_county_name', axis=1)
     
     # Do the same for price trends
-    trends_df = pd.read_csv(f'{processed_data_path}price_trends_annual.csv')
+    trends_df['county_name'] = trends_df['county_name'].astype('string[pyarrow]')
     trends_df['clean_county_name'] = trends_df['county_name'].str.lower().str.strip()
-    trends_df['fips_code'] = trends_df['clean_county_name'].map(fips_mapping)
-    trends_df.drop('clean_county_name', axis=1).to_csv(f'{processed_data_path}price_trends_annual.csv', index=False)
+    trends_df = map_fips_codes(trends_df, fips_mapping)
+    trends_df = trends_df.drop('clean_county_name', axis=1)
     
     print("✅ FIPS codes added to housing data\n")
+    
+    return affordability_df, trends_df
 
-def add_fips_to_population_data(fips_mapping):
+def add_fips_to_population_data(population_df, fips_mapping):
     """
     Add FIPS codes to population data
     """
     print("7. Adding FIPS codes to population data...")
     
-    population_df = pd.read_csv(f'{processed_data_path}population_annual.csv')
-    
     # Clean county names - remove leading dots and extra spaces
+    population_df['county_name'] = population_df['county_name'].astype('string[pyarrow]')
     population_df['clean_county_name'] = (population_df['county_name']
                                         .str.replace('.', '', regex=False)
                                         .str.lower()
                                         .str.strip())
     
     # Map FIPS codes
-    population_df['fips_code'] = population_df['clean_county_name'].map(fips_mapping)
+    population_df = map_fips_codes(population_df, fips_mapping)
     
     # Check mapping success
     mapped_count = population_df['fips_code'].notna().sum()
     total_count = len(population_df)
     print(f"FIPS mapping success: {mapped_count}/{total_count} ({mapped_count/total_count*100:.1f}%)")
-    
-    # Save updated population data
-    population_df.drop('clean_county_name', axis=1).to_csv(f'{processed_data_path}population_annual.csv', index=False)
+    population_df = population_df.drop('clean_county_name', axis=1)
     print("✅ FIPS codes added to population data\n")
+    
+    return population_df
 
 if __name__ == "__main__":
+    # Read every processed table once
+    tables = load_processed_tables()
+    
     # Fix FIPS code formatting
-    counties_df, economic_df = check_and_fix_fips_codes()
+    counties_df, economic_df = check_and_fix_fips_codes(tables['counties'],
+                                                        tables['economic_annual'],
+                                                        tables['population_annual'])
+    tables['counties'] = counties_df
+    tables['economic_annual'] = economic_df
     
     # Create mapping between county names and FIPS codes
     fips_mapping = create_county_name_to_fips_mapping(counties_df)
     
     # Add FIPS codes to housing data
-    add_fips_to_housing_data(fips_mapping)
+    affordability_df, trends_df = add_fips_to_housing_data(tables['housing_affordability'],
+                                                           tables['price_trends_annual'],
+                                                           fips_mapping)
+    tables['housing_affordability'] = affordability_df
+    tables['price_trends_annual'] = trends_df
     
     # Add FIPS codes to population data
-    add_fips_to_population_data(fips_mapping)
+    tables['population_annual'] = add_fips_to_population_data(tables['population_annual'], fips_mapping)
+    
+    # Write everything back in one pass
+    save_processed_tables(tables)
     
     print("=== FIPS CODE FIXING COMPLETE ===")
     print("All datasets now have proper 5-digit FIPS codes!")
     print("\nFiles updated:")
-    print("- counties.csv (FIPS codes fixed)")
-    print("- economic_annual.csv (FIPS codes fixed)")
-    print("- housing_affordability.csv (FIPS codes added)")
-    print("- price_trends_annual.csv (FIPS codes added)")
-    print("- population_annual.csv (FIPS codes added)")
+    print(f"- counties{table_ext} (FIPS codes fixed)")
+    print(f"- economic_annual{table_ext} (FIPS codes fixed)")
+    print(f"- housing_affordability{table_ext} (FIPS codes added)")
+    print(f"- price_trends_annual{table_ext} (FIPS codes added)")
+    print(f"- population_annual{table_ext} (FIPS codes added)")
     print("- county_fips_mapping.csv (new reference file)")
     
     print("\n✅ Ready for SQL database setup!")
\ No newline at end of file
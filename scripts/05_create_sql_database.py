@@ -1,71 +1,379 @@
 import sqlite3
-import pandas as pd
+import re
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from table_io import table_path
+from query_plans import validate_plans
+
+# DuckDB is optional: when installed, its vectorized Parquet reader loads the
+# large monthly table straight into the SQLite file. This also needs DuckDB's
+# sqlite extension, which is never downloaded here: install it once with
+# network access (python -c "import duckdb; duckdb.install_extension('sqlite')")
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# apsw is optional too: when installed, the loader connections use it to bind
+# the values through SQLite's C API without sqlite3's adapter layer
+try:
+    import apsw
+except ImportError:
+    apsw = None
 
 # Set up paths
-processed_data_path = '../data/processed/'
 database_path = '../data/housing_market.db'
+template_path = '../data/housing_market.db.template'
+# The new database is built here and only replaces database_path once every
+# table has loaded, so a failed run leaves the previous database untouched
+build_path = '../data/housing_market.db.build'
+
+# SQLite page size for the database file (the largest SQLite supports)
+page_size = 65536
+
+# Table definitions, in import order. The columns are declared up front so
+# the rows can be streamed straight into SQLite without pandas inferring types
+TABLE_SCHEMAS = {
+    # Master geographic reference. fips_code is the INTEGER PRIMARY KEY, i.e.
+    # an alias of the rowid: joins on it are direct rowid lookups and no extra
+    # index is needed. FIPS codes are stored as numbers ('01001' -> 1001) in
+    # every table, so the joins compare integers without type conversions
+    'counties': """
+        CREATE TABLE counties (
+            fips_code INTEGER PRIMARY KEY,
+            state TEXT,
+            county_name TEXT,
+            rural_urban_code REAL,
+            urban_influence_code REAL,
+            metro_status REAL
+        )""",
+    # Unemployment + income
+    'economic_annual': """
+        CREATE TABLE economic_annual (
+            fips_code INTEGER,
+            unemployment_rate REAL,
+            year INTEGER,
+            median_household_income_2022 REAL
+        )""",
+    'population_annual': """
+        CREATE TABLE population_annual (
+            county_name TEXT,
+            year INTEGER,
+            population REAL,
+            fips_code INTEGER
+        )""",
+    # Large table. Dates are stored as INTEGER days since 1970-01-01 (a 2-3
+    # byte varint instead of 10 bytes of text): date(date * 86400, 'unixepoch')
+    # turns them back into 'YYYY-MM-DD'
+    'housing_prices_monthly': """
+        CREATE TABLE housing_prices_monthly (
+            RegionID INTEGER,
+            RegionName TEXT,
+            StateName TEXT,
+            State TEXT,
+            date INTEGER,
+            bottom_tier_price REAL,
+            top_tier_price REAL,
+            year INTEGER,
+            month INTEGER,
+            county_name TEXT
+        )""",
+    # With min salary calculations
+    'housing_affordability': """
+        CREATE TABLE housing_affordability (
+            RegionID INTEGER,
+            county_name TEXT,
+            year INTEGER,
+            bottom_tier_price REAL,
+            top_tier_price REAL,
+            bottom_tier_annual_cost REAL,
+            top_tier_annual_cost REAL,
+            bottom_tier_min_salary REAL,
+            top_tier_min_salary REAL,
+            fips_code INTEGER
+        )""",
+    'price_trends_annual': """
+        CREATE TABLE price_trends_annual (
+            RegionID INTEGER,
+            county_name TEXT,
+            year INTEGER,
+            bottom_tier_price REAL,
+            top_tier_price REAL,
+            bottom_tier_growth REAL,
+            top_tier_growth REAL,
+            fips_code INTEGER
+        )""",
+}
+
+# Indexes on commonly joined/filtered columns. They are built once the data
+# is in (see create_indexes).
+# The yearly tables are joined on fips_code AND year, so one composite index
+# answers both predicates
+INDEXES = {
+    # Lookups of a state's counties (counties is keyed by fips_code)
+    'idx_counties_state': 'counties(state)',
+    'idx_economic_fips_year': 'economic_annual(fips_code, year)',
+    'idx_population_fips_year': 'population_annual(fips_code, year)',
+    'idx_housing_monthly_region': 'housing_prices_monthly(RegionID)',
+    'idx_housing_monthly_date': 'housing_prices_monthly(date)',
+    'idx_affordability_fips_year': 'housing_affordability(fips_code, year)',
+    'idx_trends_fips_year': 'price_trends_annual(fips_code, year)',
+    # Most analysis queries look at 2022 only. These partial indexes hold just
+    # the 2022 rows and every column those queries read (year included, so
+    # SQLite never has to visit the table), a much smaller B-tree to search
+    'idx_economic_2022': 'economic_annual(fips_code, year, unemployment_rate, '
+                         'median_household_income_2022) WHERE year = 2022',
+    'idx_affordability_2022': 'housing_affordability(fips_code, year, bottom_tier_min_salary, '
+                              'top_tier_min_salary) WHERE year = 2022'
+}
+
+# Rows are read and converted in batches of this size
+BATCH_SIZE = 10000
+
+# Arrow types for the declared SQLite column types
+ARROW_TYPES = {'INTEGER': pa.int64(), 'REAL': pa.float64(), 'TEXT': pa.string()}
+
+# Date columns: date strings in the CSV files, days since 1970-01-01 in SQLite
+DATE_COLUMNS = {'date'}
+# Date formats accepted in CSV files: ISO dates as written by the cleaning
+# scripts, and month/day/year as in the committed processed CSVs
+CSV_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y']
+
+def csv_column_types(table):
+    """
+    Column types for reading a table's CSV file, taken from its CREATE TABLE
+    """
+    columns = re.findall(r'^\s*(\w+) (INTEGER|REAL|TEXT)\b', TABLE_SCHEMAS[table], re.MULTILINE)
+    # Dates are read as timestamps so the CSV_DATE_FORMATS parsers apply
+    # (a date32 column only accepts ISO dates)
+    return {name: pa.timestamp('s') if name in DATE_COLUMNS else ARROW_TYPES[sql_type]
+            for name, sql_type in columns}
+
+def iter_table_rows(name):
+    """
+    Stream a processed table: yields the column names, then one tuple per row
+    """
+    # The files are read in record batches, so only one batch of rows exists
+    # as Python objects at a time (not the whole table)
+    path = table_path(name)
+    if path.endswith('.parquet'):
+        parquet_file = pq.ParquetFile(path)
+        column_names = parquet_file.schema_arrow.names
+        batches = parquet_file.iter_batches(batch_size=BATCH_SIZE)
+    else:
+        # pyarrow's streaming CSV reader parses each block straight into the
+        # declared column types, so nothing is inferred and SQLite receives
+        # typed values (empty fields are missing values)
+        batches = pacsv.open_csv(path,
+                                 convert_options=pacsv.ConvertOptions(
+                                     column_types=csv_column_types(name),
+                                     timestamp_parsers=CSV_DATE_FORMATS,
+                                     strings_can_be_null=True))
+        column_names = batches.schema.names
+    yield column_names
+    
+    for batch in batches:
+        columns = []
+        for column in batch.columns:
+            # Store dates as days since 1970-01-01 (date32 is exactly that count)
+            if pa.types.is_timestamp(column.type) or pa.types.is_date(column.type):
+                column = column.cast(pa.date32()).cast(pa.int32())
+            columns.append(column.to_pylist())
+        yield from zip(*columns)
+
+def find_missing_inputs():
+    """
+    List the processed files that a table has no input for
+    """
+    return [table_path(table) for table in TABLE_SCHEMAS
+            if not os.path.exists(table_path(table))]
 
 def create_database_connection():
     """
     Create SQLite database connection
     """
     print("Creating SQLite database connection...")
-    conn = sqlite3.connect(database_path)
-    print(f"✅ Database created: {database_path}")
+    # Start from an empty file (a failed earlier run may have left one behind)
+    for path in [build_path, f'{build_path}-wal', f'{build_path}-shm']:
+        if os.path.exists(path):
+            os.remove(path)
+    
+    conn = open_database(build_path)
+    # 64KB pages suit the long tables (fewer B-tree levels), page_size
+    # applies right away since the file is new
+    conn.execute(f"PRAGMA page_size={page_size}")
+    print(f"✅ Database created: {build_path}")
     return conn
 
+def open_database(path):
+    """
+    Open a connection to one of the database files
+    """
+    # detect_types=0: no declared-type/converter lookups on the values we read back
+    conn = sqlite3.connect(path, detect_types=0)
+    # Read pages through a memory map (up to 1GB) instead of copying each one
+    # in with a read() call
+    conn.execute("PRAGMA mmap_size=1073741824")
+    return conn
+
+def build_schema_script():
+    """
+    Build one SQL script that creates every table
+    """
+    return "BEGIN;\n" + ";\n".join(TABLE_SCHEMAS.values()) + ";\nCOMMIT;"
+
+def import_table(conn, table, rows):
+    """
+    Insert the rows (column names first) into a freshly created table
+    """
+    columns = next(rows)
+    # One INSERT statement per table: SQLite compiles it once and executemany
+    # only rebinds the values for each row
+    insert_sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                  f"VALUES ({', '.join(['?'] * len(columns))})")
+    conn.executemany(insert_sql, rows)
+    
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def open_loader_connection():
+    """
+    Open the autocommit connection all tables are loaded through (apsw if installed)
+    """
+    if apsw is not None:
+        conn = apsw.Connection(build_path)
+    else:
+        conn = sqlite3.connect(build_path, isolation_level=None, detect_types=0)
+    
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-200000")
+    return conn
+
+def read_table_rows(table):
+    """
+    Read a whole (small) table into memory, column names first
+    """
+    return list(iter_table_rows(table))
+
+def import_table_in_transaction(conn, table, rows):
+    """
+    Import a table through the loader connection, in its own transaction
+    """
+    conn.execute("BEGIN")
+    record_count = import_table(conn, table, iter(rows))
+    conn.execute("COMMIT")
+    return record_count
+
+def duckdb_sqlite_installed():
+    """
+    Check whether DuckDB's sqlite extension is already installed locally
+    """
+    # The extension is listed as sqlite_scanner ('sqlite' is one of its aliases)
+    with duckdb.connect() as duck:
+        installed = duck.execute(
+            "SELECT installed FROM duckdb_extensions() WHERE extension_name = 'sqlite_scanner'"
+        ).fetchone()
+    return bool(installed and installed[0])
+
+def import_monthly_prices_with_duckdb():
+    """
+    Load housing_prices_monthly from Parquet with DuckDB's sqlite extension
+    """
+    table = 'housing_prices_monthly'
+    
+    # DuckDB writes into the table created by build_schema_script (keeping our column types),
+    # with the dates stored as days since 1970-01-01 like the sqlite3 path.
+    # Only the locally installed extension is loaded (no automatic download)
+    with duckdb.connect(config={'autoinstall_known_extensions': False}) as duck:
+        duck.execute("LOAD sqlite")
+        duck.execute(f"ATTACH '{build_path}' AS housing (TYPE SQLITE)")
+        duck.execute(f"""
+            INSERT INTO housing.{table} BY NAME
+            SELECT * REPLACE (date_diff('day', DATE '1970-01-01', date::DATE) AS date)
+            FROM read_parquet('{table_path(table)}')
+        """)
+        return duck.execute(f"SELECT COUNT(*) FROM housing.{table}").fetchone()[0]
+
+def set_load_pragmas(conn):
+    """
+    Tune the build connection for the bulk load
+    """
+    # The database is rebuilt from the processed files on every run, so trade
+    # durability for load speed: no fsync per commit, WAL journal, temp
+    # tables in memory and a ~200MB page cache
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=OFF;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-200000;
+    """)
+
 def create_tables_and_import_data(conn):
     """
-    Create tables and import all our cleaned CSV data
+    Create tables and import all our cleaned data
+    Returns the (possibly reopened) connection and the row count per table
     """
     print("\n=== CREATING TABLES AND IMPORTING DATA ===\n")
     
-    # 1. Counties table (master geographic reference)
-    print("1. Creating counties table...")
-    counties_df = pd.read_csv(f'{processed_data_path}counties.csv')
-    counties_df.to_sql('counties', conn, if_exists='replace', index=False)
-    print(f"   ✅ Counties table: {len(counties_df)} records")
-    
-    # 2. Economic annual data (unemployment + income)
-    print("2. Creating economic_annual table...")
-    economic_df = pd.read_csv(f'{processed_data_path}economic_annual.csv')
-    economic_df.to_sql('economic_annual', conn, if_exists='replace', index=False)
-    print(f"   ✅ Economic annual table: {len(economic_df)} records")
-    
-    # 3. Population data
-    print("3. Creating population_annual table...")
-    population_df = pd.read_csv(f'{processed_data_path}population_annual.csv')
-    population_df.to_sql('population_annual', conn, if_exists='replace', index=False)
-    print(f"   ✅ Population annual table: {len(population_df)} records")
-    
-    # 4. Housing prices monthly (large table)
-    print("4. Creating housing_prices_monthly table...")
-    print("   (This may take a moment - large dataset)")
-    housing_monthly_df = pd.read_csv(f'{processed_data_path}housing_prices_monthly.csv')
-    housing_monthly_df.to_sql('housing_prices_monthly', conn, if_exists='replace', index=False)
-    print(f"   ✅ Housing prices monthly table: {len(housing_monthly_df)} records")
-    
-    # 5. Housing affordability (with min salary calculations)
-    print("5. Creating housing_affordability table...")
-    affordability_df = pd.read_csv(f'{processed_data_path}housing_affordability.csv')
-    affordability_df.to_sql('housing_affordability', conn, if_exists='replace', index=False)
-    print(f"   ✅ Housing affordability table: {len(affordability_df)} records")
-    
-    # 6. Price trends annual
-    print("6. Creating price_trends_annual table...")
-    trends_df = pd.read_csv(f'{processed_data_path}price_trends_annual.csv')
-    trends_df.to_sql('price_trends_annual', conn, if_exists='replace', index=False)
-    print(f"   ✅ Price trends annual table: {len(trends_df)} records")
-    
-    return {
-        'counties': len(counties_df),
-        'economic_annual': len(economic_df),
-        'population_annual': len(population_df),
-        'housing_prices_monthly': len(housing_monthly_df),
-        'housing_affordability': len(affordability_df),
-        'price_trends_annual': len(trends_df)
-    }
+    set_load_pragmas(conn)
+    
+    # Create all six tables in one script (a single call and transaction).
+    # Indexes are built afterwards (create_indexes), once over the final
+    # tables instead of being maintained row by row
+    conn.executescript(build_schema_script())
+    
+    # Let DuckDB load the large monthly table first (it writes through its own
+    # connection, so this has to happen before the other loads start)
+    table_counts = {}
+    if (duckdb is not None and table_path('housing_prices_monthly').endswith('.parquet')
+            and duckdb_sqlite_installed()):
+        # DuckDB writes through its own bundled copy of SQLite. Two SQLite
+        # libraries must not hold the same file open in one process (closing
+        # either one's handle drops the other's file locks), so the sqlite3
+        # connection is closed while DuckDB works and reopened afterwards
+        conn.close()
+        try:
+            table_counts['housing_prices_monthly'] = import_monthly_prices_with_duckdb()
+        except duckdb.Error as error:
+            print(f"⚠️ DuckDB import failed, loading housing_prices_monthly with sqlite3: {error}")
+        
+        conn = open_database(build_path)
+        set_load_pragmas(conn)
+        if 'housing_prices_monthly' not in table_counts:
+            # Clear any rows DuckDB wrote before it failed
+            conn.execute("DELETE FROM housing_prices_monthly")
+            conn.commit()
+    
+    # All tables are written by this thread through one loader connection,
+    # one transaction per table, so no write ever waits on a lock. The five
+    # small tables are read and converted on worker threads (the file parsing
+    # overlaps) and inserted as each one is ready, then the large monthly
+    # table streams in
+    small_tables = [table for table in TABLE_SCHEMAS if table != 'housing_prices_monthly']
+    loader = open_loader_connection()
+    try:
+        with ThreadPoolExecutor(max_workers=len(small_tables)) as executor:
+            futures = {table: executor.submit(read_table_rows, table) for table in small_tables}
+            for table, future in futures.items():
+                table_counts[table] = import_table_in_transaction(loader, table, future.result())
+        
+        if 'housing_prices_monthly' not in table_counts:
+            table_counts['housing_prices_monthly'] = import_table_in_transaction(
+                loader, 'housing_prices_monthly', iter_table_rows('housing_prices_monthly'))
+    finally:
+        loader.close()
+    
+    # Report in the usual table order
+    table_counts = {table: table_counts[table] for table in TABLE_SCHEMAS}
+    for i, table in enumerate(table_counts, start=1):
+        label = table.replace('_', ' ').capitalize()
+        print(f"{i}. Created {table} table")
+        print(f"   ✅ {label} table: {table_counts[table]} records")
+    
+    return conn, table_counts
 
 def create_indexes(conn):
     """
@@ -75,27 +383,88 @@ def create_indexes(conn):
     
     cursor = conn.cursor()
     
-    # Create indexes on commonly joined/filtered columns
-    indexes = [
-        "CREATE INDEX IF NOT EXISTS idx_counties_fips ON counties(fips_code)",
-        "CREATE INDEX IF NOT EXISTS idx_economic_fips ON economic_annual(fips_code)",
-        "CREATE INDEX IF NOT EXISTS idx_economic_year ON economic_annual(year)",
-        "CREATE INDEX IF NOT EXISTS idx_population_fips ON population_annual(fips_code)",
-        "CREATE INDEX IF NOT EXISTS idx_population_year ON population_annual(year)",
-        "CREATE INDEX IF NOT EXISTS idx_housing_monthly_region ON housing_prices_monthly(RegionID)",
-        "CREATE INDEX IF NOT EXISTS idx_housing_monthly_date ON housing_prices_monthly(date)",
-        "CREATE INDEX IF NOT EXISTS idx_affordability_fips ON housing_affordability(fips_code)",
-        "CREATE INDEX IF NOT EXISTS idx_affordability_year ON housing_affordability(year)",
-        "CREATE INDEX IF NOT EXISTS idx_trends_fips ON price_trends_annual(fips_code)",
-        "CREATE INDEX IF NOT EXISTS idx_trends_year ON price_trends_annual(year)"
-    ]
-    
-    for index_sql in indexes:
-        cursor.execute(index_sql)
-        print(f"✅ Index created: {index_sql.split()[-1]}")
+    for index_name, index_on in INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {index_on}")
+        print(f"✅ Index created: {index_on}")
+    
+    # Gather table/index statistics so the query planner can pick the best
+    # index for the joins on fips_code/year
+    cursor.execute("ANALYZE")
+    print("✅ Table statistics updated (ANALYZE)")
     
     conn.commit()
 
+def close_write_ahead_log(conn):
+    """
+    Switch the finished database back to a rollback journal
+    WAL only speeds up the bulk load - the finished file (and the template
+    copied from it) should open as a single self-contained file
+    """
+    # Fold the WAL file back into the database and truncate it, then leave
+    # WAL mode (persistent WAL would otherwise stick to the file)
+    conn.executescript("""
+        PRAGMA wal_checkpoint(TRUNCATE);
+        PRAGMA journal_mode=DELETE;
+    """)
+    print("✅ Write-ahead log checkpointed (journal_mode=DELETE)")
+
+def replace_database(conn):
+    """
+    Move the finished build over the previous database and reopen it
+    """
+    conn.close()
+    # The old database's journal files belong to the file being replaced
+    for path in [f'{database_path}-wal', f'{database_path}-shm', f'{database_path}-journal']:
+        if os.path.exists(path):
+            os.remove(path)
+    
+    # os.replace is atomic: readers see either the old or the new database
+    os.replace(build_path, database_path)
+    print(f"✅ Database replaced: {database_path}")
+    return open_database(database_path)
+
+def save_template_database(conn):
+    """
+    Snapshot the finished database with SQLite's online backup API
+    test_db.py starts from a copy of this file instead of a full re-import
+    """
+    template = sqlite3.connect(template_path)
+    # A template left by an earlier run may still be in WAL mode
+    template.execute("PRAGMA journal_mode=DELETE")
+    # backup() copies the database page by page, indexes and statistics included
+    with template:
+        conn.backup(template)
+    template.close()
+    print(f"✅ Template database saved: {template_path}")
+
+# Sample queries run by test_database (and checked by validate_plans)
+SAMPLE_ANALYSIS_QUERY = """
+    SELECT 
+        c.county_name,
+        c.state,
+        e.unemployment_rate,
+        e.median_household_income_2022,
+        h.bottom_tier_min_salary,
+        h.top_tier_min_salary
+    FROM counties c
+    JOIN economic_annual e ON c.fips_code = e.fips_code AND e.year = 2022
+    JOIN housing_affordability h ON c.fips_code = h.fips_code AND h.year = 2022
+    WHERE c.state = 'CA'
+    ORDER BY h.bottom_tier_min_salary DESC
+    LIMIT 5
+    """
+
+PRICE_TRENDS_QUERY = """
+    SELECT 
+        county_name,
+        year,
+        bottom_tier_price,
+        bottom_tier_growth
+    FROM price_trends_annual 
+    WHERE county_name LIKE '%Los Angeles%' AND year >= 2020
+    ORDER BY year
+    """
+
 def test_database(conn):
     """
     Run test queries to verify everything works
@@ -116,23 +485,7 @@ def test_database(conn):
     
     # Test 2: Sample JOIN query
     print("\n2. Sample analysis query:")
-    query = """
-    SELECT 
-        c.county_name,
-        c.state,
-        e.unemployment_rate,
-        e.median_household_income_2022,
-        h.bottom_tier_min_salary,
-        h.top_tier_min_salary
-    FROM counties c
-    JOIN economic_annual e ON c.fips_code = e.fips_code AND e.year = 2022
-    JOIN housing_affordability h ON c.fips_code = h.fips_code AND h.year = 2022
-    WHERE c.state = 'CA'
-    ORDER BY h.bottom_tier_min_salary DESC
-    LIMIT 5
-    """
-    
-    cursor.execute(query)
+    cursor.execute(SAMPLE_ANALYSIS_QUERY)
     results = cursor.fetchall()
     
     print("   Top 5 CA counties by minimum salary needed (2022):")
@@ -142,18 +495,7 @@ def test_database(conn):
     
     # Test 3: Time series data
     print("\n3. Housing price trends (sample):")
-    trend_query = """
-    SELECT 
-        county_name,
-        year,
-        bottom_tier_price,
-        bottom_tier_growth
-    FROM price_trends_annual 
-    WHERE county_name LIKE '%Los Angeles%' AND year >= 2020
-    ORDER BY year
-    """
-    
-    cursor.execute(trend_query)
+    cursor.execute(PRICE_TRENDS_QUERY)
     trend_results = cursor.fetchall()
     
     for row in trend_results:
@@ -297,15 +639,39 @@ LIMIT 15;
 if __name__ == "__main__":
     print("=== SETTING UP SQL DATABASE ===\n")
     
+    # Check every input before the database is touched, so a missing file
+    # can't leave it half rebuilt
+    missing_inputs = find_missing_inputs()
+    if missing_inputs:
+        print("❌ Missing processed data files (run the cleaning scripts first):")
+        for path in missing_inputs:
+            print(f"   {path}")
+        sys.exit(1)
+    
     # Create database connection
     conn = create_database_connection()
     
     # Import all data
-    table_counts = create_tables_and_import_data(conn)
+    conn, table_counts = create_tables_and_import_data(conn)
     
     # Create indexes for performance
     create_indexes(conn)
     
+    # Leave WAL mode before the database is moved into place and snapshotted
+    close_write_ahead_log(conn)
+    
+    # Everything loaded: swap the new database in for the old one
+    conn = replace_database(conn)
+    
+    # Keep a snapshot of the finished database for test runs
+    save_template_database(conn)
+    
+    # Make sure the test queries are answered through the indexes
+    full_scans = validate_plans(conn, [
+        ('Sample analysis query', SAMPLE_ANALYSIS_QUERY, ()),
+        ('Housing price trends', PRICE_TRENDS_QUERY, ())
+    ])
+    
     # Test database
     test_database(conn)
     
@@ -332,4 +698,11 @@ if __name__ == "__main__":
     print("3. Create visualizations")
     print("4. Write up findings for portfolio")
     
-    print(f"\n📁 Database file: {os.path.abspath(database_path)}")
\ No newline at end of file
+    print(f"\n📁 Database file: {os.path.abspath(database_path)}")
+    
+    # Fail the run if a test query reads a whole table
+    if full_scans:
+        print(f"\n⚠️ {len(full_scans)} query plan step(s) scan a whole table:")
+        for name, scan in full_scans:
+            print(f"   {name}: {scan}")
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Query plan checks shared by 05_create_sql_database.py and test_db.py
+"""
+
+def validate_plans(conn, queries):
+    """
+    Check the query plans (EXPLAIN QUERY PLAN) for full table scans
+    Takes (name, sql, params) tuples, returns the steps that scan a whole table
+    """
+    print("\n=== CHECKING QUERY PLANS ===\n")
+    
+    full_scans = []
+    for name, sql, params in queries:
+        plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        # CTEs and subqueries run as co-routines (or are materialized first):
+        # scanning their output doesn't read a table
+        derived = {step.split(' ', 1)[1] for step in plan
+                   if step.startswith(('CO-ROUTINE ', 'MATERIALIZE '))}
+        # 'SCAN t USING [COVERING] INDEX ...' walks an index, only a bare
+        # 'SCAN t' reads every row of the table
+        scans = [step for step in plan
+                 if step.startswith('SCAN ') and 'USING' not in step and step[5:] not in derived]
+        if scans:
+            print(f"⚠️ {name}: {'; '.join(scans)}")
+            full_scans.extend((name, scan) for scan in scans)
+        else:
+            print(f"✅ {name}: uses indexes")
+    
+    return full_scans
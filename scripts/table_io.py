@@ -0,0 +1,61 @@
+"""
+Shared settings and helpers for reading/writing the pipeline's tables
+Imported by the pipeline scripts
+"""
+import pandas as pd
+import os
+
+# Copy-on-Write (always on from pandas 3.0): column selections and filters
+# share memory until they are modified, so no defensive .copy() is needed.
+# Importing this module turns it on for the pipeline scripts on pandas 2.x
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Set up paths
+processed_data_path = '../data/processed/'
+
+# Intermediate tables are stored as Parquet (keeps dtypes, much smaller/faster
+# than CSV). Set HOUSING_USE_CSV=1 to keep writing/reading plain CSV files.
+use_parquet = os.environ.get('HOUSING_USE_CSV') != '1'
+table_ext = '.parquet' if use_parquet else '.csv'
+
+# Prefer the Rust-based calamine reader for Excel files, fall back to openpyxl
+# (python-calamine is optional: pip install python-calamine)
+try:
+    import python_calamine  # noqa: F401
+    excel_engine = 'calamine'
+except ImportError:
+    excel_engine = 'openpyxl'
+
+def save_table(df, name):
+    """
+    Save a processed table as Parquet (or CSV when HOUSING_USE_CSV=1)
+    """
+    if use_parquet:
+        df.to_parquet(f'{processed_data_path}{name}.parquet', engine='pyarrow',
+                      compression='zstd', index=False)
+    else:
+        df.to_csv(f'{processed_data_path}{name}.csv', index=False)
+
+def table_path(name):
+    """
+    Path of a processed table: the Parquet file, or the CSV file when
+    HOUSING_USE_CSV=1 or no Parquet file has been written yet
+    """
+    # The repo only ships the CSV files, so a fresh checkout still loads
+    # them until the cleaning scripts have been re-run
+    parquet_path = f'{processed_data_path}{name}.parquet'
+    if use_parquet and os.path.exists(parquet_path):
+        return parquet_path
+    return f'{processed_data_path}{name}.csv'
+
+def load_table(name, dtype=None):
+    """
+    Load a processed table saved by save_table
+    dtype is only needed for CSV files (Parquet keeps the saved dtypes)
+    """
+    path = table_path(name)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, engine='pyarrow')
+    # pyarrow's multithreaded CSV parser is much faster on the wide/long tables
+    return pd.read_csv(path, engine='pyarrow', dtype_backend='pyarrow', dtype=dtype)
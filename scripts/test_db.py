@@ -1,36 +1,72 @@
 import sqlite3
+import shutil
+import os
+import sys
+from query_plans import validate_plans
 
-conn = sqlite3.connect('../data/housing_market.db')
+# Test against a fresh copy of the template snapshot that
+# 05_create_sql_database.py saves (a plain file copy, no re-import needed).
+# The template isn't committed, so on a fresh clone copy the database itself
+source_path = '../data/housing_market.db.template'
+if not os.path.exists(source_path):
+    source_path = '../data/housing_market.db'
+if not os.path.exists(source_path):
+    sys.exit('❌ No database found - run 05_create_sql_database.py first')
+shutil.copyfile(source_path, '../data/housing_market_test.db')
+
+conn = sqlite3.connect('../data/housing_market_test.db')
+conn.execute('PRAGMA mmap_size=1073741824')  # read pages via mmap, no copies
 cursor = conn.cursor()
 
+# Test queries
+count_query = 'SELECT COUNT(*) FROM counties'
+state_query = 'SELECT county_name, state FROM counties WHERE state = ? LIMIT 3'
+# One query answers both salary thresholds: each 2022 market under 80k is
+# tagged with its tier (1 under 60k, 2 from 60k to 80k) and ROW_NUMBER keeps
+# the five cheapest markets of each tier
+affordable_markets_query = '''
+WITH markets AS (
+    SELECT c.county_name, c.state, h.bottom_tier_min_salary,
+           CASE WHEN h.bottom_tier_min_salary < 60000 THEN 1 ELSE 2 END AS tier
+    FROM counties c
+    JOIN housing_affordability h ON c.fips_code = h.fips_code
+    WHERE h.year = 2022 AND h.bottom_tier_min_salary < 80000
+),
+ranked AS (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY tier ORDER BY bottom_tier_min_salary) AS tier_rank
+    FROM markets
+)
+SELECT county_name, state, bottom_tier_min_salary, tier
+FROM ranked
+WHERE tier_rank <= 5
+ORDER BY tier, bottom_tier_min_salary
+'''
+
+# Make sure the test queries are answered through the indexes
+full_scans = validate_plans(conn, [
+    ('Total counties', count_query, ()),
+    ('Sample Texas counties', state_query, ('TX',)),
+    ('Affordable markets', affordable_markets_query, ())
+])
+print()
+
 # Test 1: Count records
-cursor.execute('SELECT COUNT(*) FROM counties')
+cursor.execute(count_query)
 print('Total counties:', cursor.fetchone()[0])
 
 # Test 2: Sample counties
-cursor.execute('SELECT county_name, state FROM counties WHERE state = "TX" LIMIT 3')
+cursor.execute(state_query, ('TX',))
 print('Sample Texas counties:', cursor.fetchall())
 
 # Test 3: Business query - affordable markets
-cursor.execute('''
-SELECT c.county_name, c.state, h.bottom_tier_min_salary 
-FROM counties c
-JOIN housing_affordability h ON c.fips_code = h.fips_code
-WHERE h.year = 2022 AND h.bottom_tier_min_salary < 60000
-LIMIT 5
-''')
-print('Affordable markets:', cursor.fetchall())
+cursor.execute(affordable_markets_query)
+affordable_markets = cursor.fetchall()
+print('Affordable markets:', [row[:3] for row in affordable_markets if row[3] == 1])
+print('Markets needing 60k–80k:', [row[:3] for row in affordable_markets if row[3] == 2])
 
 conn.close()
-print('✅ Database working perfectly!')
 
-# Add this to test_db.py or run separately
-cursor.execute('''
-SELECT c.county_name, c.state, h.bottom_tier_min_salary 
-FROM counties c
-JOIN housing_affordability h ON c.fips_code = h.fips_code
-WHERE h.year = 2022 AND h.bottom_tier_min_salary < 80000
-ORDER BY h.bottom_tier_min_salary
-LIMIT 5
-''')
-print('More realistic affordable markets:', cursor.fetchall())
\ No newline at end of file
+# Fail the test if a query reads a whole table
+if full_scans:
+    sys.exit(f'⚠️ {len(full_scans)} query plan step(s) scan a whole table')
+print('✅ Database working perfectly!')
@@ -0,0 +1,52 @@
+"""
+Tests for scripts/05_create_sql_database.py, run against the repo's committed
+processed CSV files (HOUSING_USE_CSV=1 mode)
+"""
+import datetime
+import importlib.util
+import os
+
+import pytest
+
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+script_path = os.path.join(repo_path, 'scripts', '05_create_sql_database.py')
+processed_data_path = os.path.join(repo_path, 'data', 'processed') + os.sep
+
+
+@pytest.fixture
+def setup_script(monkeypatch):
+    """
+    Load the setup script as a module, reading the committed CSV files
+    """
+    # The script imports table_io from its own directory
+    monkeypatch.syspath_prepend(os.path.dirname(script_path))
+    # The script name starts with a digit, so it is loaded from its path
+    spec = importlib.util.spec_from_file_location('create_sql_database', script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # The input paths come from table_io (table_path)
+    table_io = importlib.import_module('table_io')
+    monkeypatch.setattr(table_io, 'use_parquet', False)
+    monkeypatch.setattr(table_io, 'processed_data_path', processed_data_path)
+    return module
+
+
+def test_committed_monthly_csv_loads(setup_script):
+    rows = setup_script.iter_table_rows('housing_prices_monthly')
+    column_names = next(rows)
+    date_index = column_names.index('date')
+
+    first_row = next(rows)
+    # The committed CSV writes dates as month/day/year ('1/31/2001')
+    assert first_row[date_index] == (datetime.date(2001, 1, 31) - datetime.date(1970, 1, 1)).days
+    assert all(isinstance(row[date_index], int) for row in rows)
+
+
+@pytest.mark.parametrize('table', ['counties', 'economic_annual', 'population_annual',
+                                   'housing_prices_monthly', 'housing_affordability',
+                                   'price_trends_annual'])
+def test_committed_csv_matches_schema(setup_script, table):
+    rows = setup_script.iter_table_rows(table)
+    column_names = next(rows)
+    assert list(column_names) == list(setup_script.csv_column_types(table))
+    assert sum(1 for _ in rows) > 0